@@ -1,11 +1,15 @@
 import os
-import ast
 import joblib
 import pandas as pd
 import streamlit as st
 from dotenv import load_dotenv
 from ibm_watsonx_ai.foundation_models import ModelInference
 from ibm_watsonx_ai import Credentials
+from session_store import MAX_PREDICTIONS, PredictionRecord, ring_buffer
+from structured_output import (
+    CONDITION_MAX_TOKENS, CONDITION_SCHEMA, SYMPTOM_MAX_TOKENS, SYMPTOM_SCHEMA, StructuredOutputError,
+    format_conditions, generate_structured, normalize_symptoms
+)
 
 load_dotenv()
 
@@ -85,20 +89,12 @@ Known symptoms: {', '.join(symptoms)}
 
 Patient says: \"{text}\"
 
-Return ONLY a valid Python list of matching symptoms like [\"fever\", \"nausea\"]. Do not include any explanation or extra text.
+Respond with ONLY a JSON object of the form {{"symptoms": ["fever", "nausea"]}}, using only the known symptoms above. Do not include any explanation or extra text.
 """
     model = load_granite_model()
     try:
-        response = ""
-        for _ in range(10):
-            chunk = model.generate_text(prompt)
-            if not chunk.strip():
-                break
-            response += chunk
-            prompt += chunk
-        extracted = ast.literal_eval(response.strip())
-        if not isinstance(extracted, list):
-            extracted = []
+        response = generate_structured(model, prompt, SYMPTOM_SCHEMA, SYMPTOM_MAX_TOKENS)
+        extracted = normalize_symptoms(response["symptoms"])
         return [1 if symptom in extracted else 0 for symptom in symptoms], extracted
     except Exception:
         return [0] * len(symptoms), []
@@ -135,38 +131,32 @@ Average Blood Pressure: {avg_bp_systolic}/{avg_bp_diastolic} mmHg
 Average Blood Glucose: {avg_glucose} mg/dL
 Recently Reported Symptoms: {recent_symptoms}
 
-Format your response as:
-1. Potential condition name
-2. Likelihood (High/Medium/Low)
-3. Brief explanation
-4. Recommended next steps
-
 Provide the top 3 most likely conditions based on the data provided.
+Respond with ONLY a JSON object of the form:
+{{"conditions": [{{"name": "Potential condition name", "likelihood": "High", "explanation": "Brief explanation", "next_steps": "Recommended next steps"}}]}}
+Likelihood must be one of High, Medium or Low. Keep each explanation and next steps to one or two sentences.
 """
         granite_model = load_granite_model()
-        llm_response = ""
         try:
-            for _ in range(10):
-                chunk = granite_model.generate_text(prediction_prompt)
-                if not chunk.strip():
-                    break
-                llm_response += chunk
-                prediction_prompt += chunk
+            analysis = generate_structured(granite_model, prediction_prompt, CONDITION_SCHEMA, CONDITION_MAX_TOKENS)
+            llm_response = format_conditions(analysis["conditions"])
+        except StructuredOutputError as e:
+            llm_response = f"⚠️ LLM Prediction Error: could not parse the model response ({e})"
         except Exception as e:
             llm_response = f"⚠️ LLM Prediction Error: {e}"
 
-        result = {
-            "name": patient_name,
-            "age": patient_age,
-            "gender": patient_gender,
-            "symptoms": [s for s, v in zip(symptoms, final_features) if v == 1] + [s for s in extracted_list if s not in symptoms],
-            "prediction": disease,
-            "llm_analysis": llm_response.strip()
-        }
+        result = PredictionRecord(
+            name=patient_name,
+            age=patient_age,
+            gender=patient_gender,
+            symptoms=[s for s, v in zip(symptoms, final_features) if v == 1] + [s for s in extracted_list if s not in symptoms],
+            prediction=disease,
+            llm_analysis=llm_response.strip()
+        )
 
         st.session_state.predicted_result = result
         if "history" not in st.session_state:
-            st.session_state.history = []
+            st.session_state.history = ring_buffer(MAX_PREDICTIONS)
         st.session_state.history.append(result)
         st.session_state.uncheck_checkboxes = True
         st.rerun()
@@ -174,12 +164,12 @@ Provide the top 3 most likely conditions based on the data provided.
 
 if st.session_state.predicted_result:
     res = st.session_state.predicted_result
-    st.success(f"🧲 {res['name']}, based on your symptoms, the predicted disease (ML) is: **{res['prediction']}**")
-    st.markdown(f"• Age: {res['age']}")
-    st.markdown(f"• Gender: {res['gender']}")
-    st.markdown(f"• Symptoms: `{', '.join(res['symptoms'])}`")
+    st.success(f"🧲 {res.name}, based on your symptoms, the predicted disease (ML) is: **{res.prediction}**")
+    st.markdown(f"• Age: {res.age}")
+    st.markdown(f"• Gender: {res.gender}")
+    st.markdown(f"• Symptoms: `{', '.join(res.symptoms)}`")
     st.markdown("### 🧠 LLM-Based Prediction")
-    st.markdown(res['llm_analysis'])
+    st.markdown(res.llm_analysis)
     st.markdown("---")
 
 st.caption("⚠️ This tool is not a substitute for professional medical advice.")
@@ -4,6 +4,7 @@ import plotly.express as px
 from datetime import date
 import joblib
 import os
+from session_store import load_shared_table
 
 
 model = joblib.load("risk_model.joblib")
@@ -14,11 +15,19 @@ CSV_FILE = "patient_health_data.csv"
 SYMPTOMS = ["None", "Headache", "Nausea", "Fatigue", "Dizziness", "Chest Pain"]
 
 
-if "patient_data" not in st.session_state:
-    if os.path.exists(CSV_FILE):
-        st.session_state.patient_data = pd.read_csv(CSV_FILE).to_dict(orient="records")
-    else:
-        st.session_state.patient_data = []
+CSV_COLUMNS = ["Date", "Heart Rate", "Blood Glucose", "Systolic BP", "Diastolic BP", "Sleep", "Symptoms", "Predicted Risk"]
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_patient_table(csv_path, csv_version):
+    return load_shared_table(csv_path)
+
+
+def get_patient_table():
+    if not os.path.exists(CSV_FILE):
+        return None
+    stat = os.stat(CSV_FILE)
+    return load_patient_table(CSV_FILE, (stat.st_mtime_ns, stat.st_size))
 
 
 st.set_page_config("📊 Patient Dashboard", layout="wide")
@@ -63,16 +72,16 @@ with st.form("health_form", clear_on_submit=True):
             "Predicted Risk": risk_label
         }
 
-        st.session_state.patient_data.append(new_record)
-
-        
-        pd.DataFrame(st.session_state.patient_data).to_csv(CSV_FILE, index=False)
+        pd.DataFrame([new_record], columns=CSV_COLUMNS).to_csv(
+            CSV_FILE, mode="a", header=not os.path.exists(CSV_FILE), index=False
+        )
 
         st.success(f"✅ Entry added! Predicted Health Risk: **{risk_label}**")
 
 
-if st.session_state.patient_data:
-    df = pd.DataFrame(st.session_state.patient_data)
+patient_table = get_patient_table()
+if patient_table is not None and patient_table.num_rows:
+    df = patient_table.to_pandas()
     df["Date"] = pd.to_datetime(df["Date"], format='mixed', errors='coerce').dt.date
 
     df.sort_values("Date", inplace=True)
@@ -3,6 +3,7 @@ from dotenv import load_dotenv
 import streamlit as st
 from ibm_watsonx_ai.foundation_models import ModelInference
 from ibm_watsonx_ai import Credentials
+from session_store import MAX_CHAT_MESSAGES, recent, ring_buffer
 
 # Load environment variables
 load_dotenv()
@@ -31,7 +32,7 @@ with st.sidebar:
 # 🧠 Generate AI response with rich prompt
 def generate_response(query):
     model = init_granite_model()
-    short_history = st.session_state.chat_history[-10:]
+    short_history = recent(st.session_state.chat_history, 10)
 
     patient_context = f"""
 You are a helpful healthcare AI assistant.
@@ -58,7 +59,7 @@ Make sure your response:
 
     # Add recent chat for context
     prompt = patient_context + "\n\nRecent Conversation:\n"
-    for sender, message in short_history:
+    for _, sender, message in short_history:
         prompt += f"{sender.upper()}: {message}\n"
 
     prompt += f"\nPATIENT QUESTION:\n{query}\n\nRESPONSE:\n"
@@ -84,20 +85,28 @@ st.markdown("Chat with the intelligent healthcare assistant below.")
 
 # Session state initialization
 if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
+    st.session_state.chat_history = ring_buffer(MAX_CHAT_MESSAGES)
+if "next_message_id" not in st.session_state:
+    st.session_state.next_message_id = 0
 if "user_input" not in st.session_state:
     st.session_state.user_input = ""
 if "run_example" not in st.session_state:
     st.session_state.run_example = False
 
+# Message ids only ever increase, so widget keys stay attached to their message
+def add_chat_message(sender, message):
+    st.session_state.chat_history.append((st.session_state.next_message_id, sender, message))
+    st.session_state.next_message_id += 1
+
+
 # Send message
 def send_message():
     user_input = st.session_state.user_input.strip()
     if user_input:
         with st.spinner("Generating response..."):
             ai_response = generate_response(user_input)
-            st.session_state.chat_history.append(("You", user_input))
-            st.session_state.chat_history.append(("AI", ai_response))
+            add_chat_message("You", user_input)
+            add_chat_message("AI", ai_response)
         st.session_state.user_input = ""
 
 # Run example input
@@ -106,18 +115,18 @@ if st.session_state.run_example:
     st.session_state.run_example = False
 
 # 💬 Display chat history
-for idx, (sender, message) in enumerate(st.session_state.chat_history):
+for msg_id, sender, message in st.session_state.chat_history:
     with st.chat_message("user" if sender == "You" else "ai"):
         st.markdown(message)
         if sender == "AI":
-            st.radio("Was this helpful?", ["👍 Yes", "👎 No"], key=f"feedback_{idx}", horizontal=True)
+            st.radio("Was this helpful?", ["👍 Yes", "👎 No"], key=f"feedback_{msg_id}", horizontal=True)
 
 # 🛠️ Control buttons and example queries
 with st.container():
     col1, col2, col3, col4 = st.columns([1.2, 2, 2, 2])
     with col1:
         if st.button("🧹 Clear Chat"):
-            st.session_state.chat_history = []
+            st.session_state.chat_history.clear()
             st.session_state.user_input = ""
     examples = ["What are symptoms of diabetes?", "How to reduce fever?", "How to control migraine?"]
     for i in range(3):
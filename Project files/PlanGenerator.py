@@ -5,6 +5,7 @@ from ibm_watsonx_ai.foundation_models import ModelInference
 from ibm_watsonx_ai import Credentials
 from fpdf import FPDF
 from pathlib import Path
+from session_store import MAX_TREATMENTS, TreatmentRecord, ring_buffer
 
 
 load_dotenv()
@@ -107,7 +108,7 @@ condition = st.text_input("Enter the Medical Condition")
 
 
 if "treatment_history" not in st.session_state:
-    st.session_state.treatment_history = []
+    st.session_state.treatment_history = ring_buffer(MAX_TREATMENTS)
 
 if st.button("💊 Generate Treatment Plan"):
     if condition.strip():
@@ -115,16 +116,16 @@ if st.button("💊 Generate Treatment Plan"):
             treatment_plan = generate_treatment(condition, age, gender, medical_history, current_medications, allergies)
 
             
-            st.session_state.treatment_history.append({
-                "name": name,
-                "age": age,
-                "gender": gender,
-                "condition": condition,
-                "medical_history": medical_history,
-                "current_medications": current_medications,
-                "allergies": allergies,
-                "treatment": treatment_plan
-            })
+            st.session_state.treatment_history.append(TreatmentRecord(
+                name=name,
+                age=age,
+                gender=gender,
+                condition=condition,
+                medical_history=medical_history,
+                current_medications=current_medications,
+                allergies=allergies,
+                treatment=treatment_plan
+            ))
 
         
             file_path = create_pdf(name, age, gender, condition, medical_history, current_medications, allergies, treatment_plan)
@@ -154,14 +155,14 @@ if st.button("💊 Generate Treatment Plan"):
 if st.session_state.treatment_history:
     st.subheader("🕘 Treatment History")
     for record in st.session_state.treatment_history:
-        with st.expander(f"{record['name']} ({record['age']}) - {record['condition']}"):
+        with st.expander(f"{record.name} ({record.age}) - {record.condition}"):
             st.markdown(f"""
-            **Gender:** {record['gender']}  
-            **Medical History:** {record['medical_history']}  
-            **Current Medications:** {record['current_medications']}  
-            **Allergies:** {record['allergies']}  
+            **Gender:** {record.gender}  
+            **Medical History:** {record.medical_history}  
+            **Current Medications:** {record.current_medications}  
+            **Allergies:** {record.allergies}  
             ---
             ```
-{record['treatment']}
+{record.treatment}
             ```
             """)
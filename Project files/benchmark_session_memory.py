@@ -0,0 +1,115 @@
+import gc
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import pandas as pd
+import psutil
+
+from session_store import (
+    MAX_CHAT_MESSAGES, MAX_PREDICTIONS, MAX_TREATMENTS,
+    PredictionRecord, TreatmentRecord, load_shared_table, ring_buffer
+)
+
+
+CSV_FILE = "patient_health_data.csv"
+SESSION_COUNTS = [1, 100, 1000]
+
+# Simulated activity per session (a long-lived user on every page)
+CHAT_EXCHANGES = 60
+PREDICTIONS = 40
+TREATMENTS = 20
+
+AI_REPLY = "Drink plenty of fluids, rest, and monitor your temperature. " * 15
+LLM_ANALYSIS = "1. Influenza\n2. Likelihood: Medium\n3. Viral infection.\n4. See a doctor.\n" * 6
+TREATMENT_PLAN = "1. Paracetamol 500mg every 6 hours as needed.\n2. Rest and hydration.\n" * 40
+
+
+def rss_mb():
+    return psutil.Process(os.getpid()).memory_info().rss / (1024 * 1024)
+
+
+def make_baseline_session(csv_path):
+    chat_history = []
+    for i in range(CHAT_EXCHANGES):
+        chat_history.append(("You", f"Question {i} about my symptoms?"))
+        chat_history.append(("AI", f"{i}: {AI_REPLY}"))
+
+    history = []
+    for i in range(PREDICTIONS):
+        history.append({
+            "name": "Jane", "age": "34", "gender": "Female",
+            "symptoms": ["fever", "cough"], "prediction": "Flu",
+            "llm_analysis": f"{i}: {LLM_ANALYSIS}"
+        })
+
+    treatment_history = []
+    for i in range(TREATMENTS):
+        treatment_history.append({
+            "name": "Jane", "age": 34, "gender": "Female", "condition": "Flu",
+            "medical_history": "None", "current_medications": "None", "allergies": "None",
+            "treatment": f"{i}: {TREATMENT_PLAN}"
+        })
+
+    return {
+        "chat_history": chat_history,
+        "history": history,
+        "treatment_history": treatment_history,
+        "patient_data": pd.read_csv(csv_path).to_dict(orient="records"),
+    }
+
+
+def make_compact_session(shared_table):
+    chat_history = ring_buffer(MAX_CHAT_MESSAGES)
+    for i in range(CHAT_EXCHANGES):
+        chat_history.append((2 * i, "You", f"Question {i} about my symptoms?"))
+        chat_history.append((2 * i + 1, "AI", f"{i}: {AI_REPLY}"))
+
+    history = ring_buffer(MAX_PREDICTIONS)
+    for i in range(PREDICTIONS):
+        history.append(PredictionRecord(
+            "Jane", "34", "Female", ["fever", "cough"], "Flu", f"{i}: {LLM_ANALYSIS}"
+        ))
+
+    treatment_history = ring_buffer(MAX_TREATMENTS)
+    for i in range(TREATMENTS):
+        treatment_history.append(TreatmentRecord(
+            "Jane", 34, "Female", "Flu", "None", "None", "None", f"{i}: {TREATMENT_PLAN}"
+        ))
+
+    return {
+        "chat_history": chat_history,
+        "history": history,
+        "treatment_history": treatment_history,
+        "patient_table": shared_table,
+    }
+
+
+def measure(layout, count):
+    # Runs in a fresh process so freed memory from a previous layout cannot skew RSS
+    if layout == "compact":
+        shared_table = load_shared_table(CSV_FILE)
+        factory = lambda: make_compact_session(shared_table)
+    else:
+        pd.read_csv(CSV_FILE)
+        factory = lambda: make_baseline_session(CSV_FILE)
+
+    gc.collect()
+    before = rss_mb()
+    sessions = [factory() for _ in range(count)]
+    gc.collect()
+    after = rss_mb()
+    return after - before, len(sessions)
+
+
+if __name__ == "__main__":
+    if not os.path.exists(CSV_FILE):
+        raise FileNotFoundError(f"❌ File '{CSV_FILE}' not found.")
+
+    print("📊 Session memory benchmark (RSS growth)")
+    for count in SESSION_COUNTS:
+        for layout in ["baseline", "compact"]:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                growth_mb, sessions = pool.submit(measure, layout, count).result()
+            per_session_kb = growth_mb * 1024 / sessions
+            print(f"{layout:<10} {sessions:>6} sessions  RSS +{growth_mb:8.2f} MB  ({per_session_kb:8.1f} KB/session)")
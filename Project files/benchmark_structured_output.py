@@ -0,0 +1,245 @@
+import ast
+import json
+import random
+import re
+
+from structured_output import (
+    CONDITION_MAX_TOKENS, CONDITION_SCHEMA, SYMPTOM_MAX_TOKENS, SYMPTOM_SCHEMA, GenerationStats,
+    StructuredOutputError, generate_structured, normalize_symptoms
+)
+
+
+SYMPTOMS = [
+    "fever", "cough", "headache", "fatigue",
+    "shortness_of_breath", "chest_pain", "nausea", "sore_throat"
+]
+TRIALS = 500
+LEGACY_WINDOW = 20
+LEGACY_MAX_CALLS = 10
+
+# One mix of model behaviours, sampled independently for every call on both
+# paths; each behaviour is rendered in the format that path asked for
+BEHAVIOURS = {
+    "clean": 0.30,
+    "trailing_chatter": 0.25,
+    "preamble": 0.10,
+    "repeated_brace": 0.10,
+    "wrong_case": 0.10,
+    "unknown_item": 0.05,
+    "single_quotes": 0.05,
+    "truncated": 0.05,
+}
+
+CHATTER = (
+    "\n\nThese symptoms are commonly associated with viral infections. "
+    "Please consult a healthcare professional if they persist or get worse, "
+    "especially if you notice difficulty breathing or a high fever."
+)
+PREAMBLE = "Sure, here is the answer: "
+
+
+def tokenize(text):
+    return re.findall(r"\s*[^\s\"'\[\]{},:]+|\s*.", text)
+
+
+def sample_behaviour(rng):
+    return rng.choices(list(BEHAVIOURS), weights=list(BEHAVIOURS.values()))[0]
+
+
+class MockGraniteModel:
+    """Stand-in for ModelInference that renders a freshly sampled behaviour per call."""
+
+    def __init__(self, render, rng):
+        self.render = render
+        self.rng = rng
+        self.tokens_generated = 0
+        self._pending = None
+
+    def generate_text(self, prompt, params=None):
+        # Legacy continuation loop: each call returns the next window of the same reply
+        if self._pending is None:
+            self._pending = tokenize(self.render(sample_behaviour(self.rng)))
+        window, self._pending = self._pending[:LEGACY_WINDOW], self._pending[LEGACY_WINDOW:]
+        self.tokens_generated += len(window)
+        return "".join(window)
+
+    def generate_text_stream(self, prompt, params=None):
+        tokens = tokenize(self.render(sample_behaviour(self.rng)))[:params["max_new_tokens"]]
+        for token in tokens:
+            self.tokens_generated += 1
+            yield token
+
+
+def apply_behaviour(behaviour, text, payload_start):
+    """Shape ``text`` (the well-formed answer) according to ``behaviour``."""
+    if behaviour == "trailing_chatter":
+        return text + CHATTER
+    if behaviour == "preamble":
+        return PREAMBLE + text
+    if behaviour == "single_quotes":
+        return text.replace('"', "'")
+    if behaviour == "truncated":
+        return text[:payload_start + (len(text) - payload_start) // 2]
+    return text
+
+
+def legacy_symptom_reply(found):
+    def render(behaviour):
+        items = list(found)
+        if behaviour == "wrong_case":
+            items = [s.capitalize() for s in items]
+        if behaviour == "unknown_item":
+            items.append("runny_nose")
+        text = json.dumps(items)
+        if behaviour == "repeated_brace":
+            # The legacy prompt has no prefill, so the reply is simply well-formed
+            return text
+        return apply_behaviour(behaviour, text, 1)
+    return render
+
+
+def structured_symptom_reply(found):
+    def render(behaviour):
+        items = list(found)
+        if behaviour == "wrong_case":
+            items = [s.capitalize() for s in items]
+        if behaviour == "unknown_item":
+            items.append("runny_nose")
+        text = json.dumps({"symptoms": items})
+        if behaviour == "repeated_brace":
+            return text
+        # Prompt is prefilled with "{", so a well-behaved reply continues after it
+        return apply_behaviour(behaviour, text[1:], 0)
+    return render
+
+
+def legacy_condition_reply(conditions):
+    def render(behaviour):
+        blocks = []
+        for i, condition in enumerate(conditions, start=1):
+            likelihood = condition["likelihood"].lower() if behaviour == "wrong_case" else condition["likelihood"]
+            blocks.append(
+                f"{i}. {condition['name']}\nLikelihood: {likelihood}\n"
+                f"{condition['explanation']}\n{condition['next_steps']}"
+            )
+        return apply_behaviour(behaviour, "\n\n".join(blocks), 0)
+    return render
+
+
+def structured_condition_reply(conditions):
+    def render(behaviour):
+        items = [dict(condition) for condition in conditions]
+        if behaviour == "wrong_case":
+            for item in items:
+                item["likelihood"] = item["likelihood"].lower()
+        if behaviour == "unknown_item":
+            items[0]["icd10"] = "J11"
+        text = json.dumps({"conditions": items})
+        if behaviour == "repeated_brace":
+            return text
+        return apply_behaviour(behaviour, text[1:], 0)
+    return render
+
+
+def sample_conditions(rng):
+    names = ["Influenza", "Common cold", "Migraine", "Gastroenteritis", "Bronchitis"]
+    return [
+        {
+            "name": name,
+            "likelihood": rng.choice(["High", "Medium", "Low"]),
+            "explanation": "Symptoms and recent vitals are consistent with this condition.",
+            "next_steps": "Rest, stay hydrated and see a doctor if symptoms persist."
+        }
+        for name in rng.sample(names, 3)
+    ]
+
+
+def run_legacy(model, parse):
+    response = ""
+    prompt = "prompt"
+    for _ in range(LEGACY_MAX_CALLS):
+        chunk = model.generate_text(prompt)
+        if not chunk.strip():
+            break
+        response += chunk
+        prompt += chunk
+    return parse(response)
+
+
+def parse_legacy_symptoms(response):
+    try:
+        extracted = ast.literal_eval(response.strip())
+    except Exception:
+        return False
+    return isinstance(extracted, list) and set(normalize_symptoms(extracted)) & set(SYMPTOMS)
+
+
+def parse_legacy_conditions(response):
+    # The app renders this text as-is; count it usable if all three conditions are intact
+    likelihoods = re.findall(r"^Likelihood: (high|medium|low)$", response, re.MULTILINE | re.IGNORECASE)
+    return len(likelihoods) == 3
+
+
+def run_structured(model, schema, max_new_tokens, stats):
+    try:
+        generate_structured(model, "prompt", schema, max_new_tokens, stats=stats)
+        return True
+    except StructuredOutputError:
+        return False
+
+
+def report(label, row):
+    tokens, attempts, attempt_failures, request_failures = row
+    print(
+        f"{label:<24} per-attempt failures {attempt_failures / attempts:6.1%}   "
+        f"per-request failures {request_failures / TRIALS:6.1%}   "
+        f"tokens/request {tokens / TRIALS:7.1f}"
+    )
+
+
+if __name__ == "__main__":
+    rng = random.Random(42)
+
+    # [tokens, attempts, failed attempts, failed requests] per row
+    totals = {key: [0, 0, 0, 0] for key in ["legacy_extract", "json_extract", "legacy_cond", "json_cond"]}
+
+    def record_legacy(key, model, ok):
+        totals[key][0] += model.tokens_generated
+        totals[key][1] += 1
+        totals[key][2] += not ok
+        totals[key][3] += not ok
+
+    def record_structured(key, model, ok, stats):
+        totals[key][0] += model.tokens_generated
+        totals[key][1] += stats.attempts
+        totals[key][2] += stats.failures
+        totals[key][3] += not ok
+
+    for _ in range(TRIALS):
+        found = rng.sample(SYMPTOMS, rng.randint(1, 3))
+        conditions = sample_conditions(rng)
+
+        legacy = MockGraniteModel(legacy_symptom_reply(found), rng)
+        record_legacy("legacy_extract", legacy, run_legacy(legacy, parse_legacy_symptoms))
+
+        structured = MockGraniteModel(structured_symptom_reply(found), rng)
+        stats = GenerationStats()
+        ok = run_structured(structured, SYMPTOM_SCHEMA, SYMPTOM_MAX_TOKENS, stats)
+        record_structured("json_extract", structured, ok, stats)
+
+        legacy = MockGraniteModel(legacy_condition_reply(conditions), rng)
+        record_legacy("legacy_cond", legacy, run_legacy(legacy, parse_legacy_conditions))
+
+        structured = MockGraniteModel(structured_condition_reply(conditions), rng)
+        stats = GenerationStats()
+        ok = run_structured(structured, CONDITION_SCHEMA, CONDITION_MAX_TOKENS, stats)
+        record_structured("json_cond", structured, ok, stats)
+
+    print(f"📊 Structured output benchmark ({TRIALS} requests per row, mock model)")
+    print("Behaviour mix per call: " + ", ".join(f"{name} {weight:.0%}" for name, weight in BEHAVIOURS.items()))
+    print("Symptom extraction")
+    report("  legacy list + ast", totals["legacy_extract"])
+    report("  JSON schema + stream", totals["json_extract"])
+    print("Top-3 condition analysis")
+    report("  legacy free text", totals["legacy_cond"])
+    report("  JSON schema + stream", totals["json_cond"])
@@ -0,0 +1,104 @@
+import os
+import tempfile
+import zlib
+from collections import deque
+from itertools import islice
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+
+# Per-session history limits (oldest entries are dropped first)
+MAX_CHAT_MESSAGES = 50
+MAX_PREDICTIONS = 20
+MAX_TREATMENTS = 10
+
+
+def ring_buffer(maxlen):
+    return deque(maxlen=maxlen)
+
+
+def recent(buffer, count):
+    return list(islice(buffer, max(len(buffer) - count, 0), None))
+
+
+class PredictionRecord:
+    __slots__ = ("name", "age", "gender", "symptoms", "prediction", "llm_analysis")
+
+    def __init__(self, name, age, gender, symptoms, prediction, llm_analysis):
+        self.name = name
+        self.age = age
+        self.gender = gender
+        self.symptoms = tuple(symptoms)
+        self.prediction = prediction
+        self.llm_analysis = llm_analysis
+
+
+class TreatmentRecord:
+    __slots__ = ("name", "age", "gender", "condition", "medical_history",
+                 "current_medications", "allergies", "_treatment")
+
+    def __init__(self, name, age, gender, condition, medical_history, current_medications, allergies, treatment):
+        self.name = name
+        self.age = age
+        self.gender = gender
+        self.condition = condition
+        self.medical_history = medical_history
+        self.current_medications = current_medications
+        self.allergies = allergies
+        self._treatment = zlib.compress(treatment.encode("utf-8"))
+
+    @property
+    def treatment(self):
+        return zlib.decompress(self._treatment).decode("utf-8")
+
+
+def load_shared_table(csv_path):
+    """Return a read-only, memory-mapped Arrow table for ``csv_path``.
+
+    Each version of the CSV (by mtime and size) is converted once into its
+    own uncompressed Arrow file next to it, so every session in the process
+    reads the same mapped pages instead of holding its own copy. A file that
+    may still be mapped is never overwritten; older versions are removed on
+    a best-effort basis.
+    """
+    if not os.path.exists(csv_path):
+        return None
+
+    stat = os.stat(csv_path)
+    stem = os.path.splitext(csv_path)[0]
+    arrow_path = f"{stem}.{stat.st_mtime_ns}-{stat.st_size}.arrow"
+    if not os.path.exists(arrow_path):
+        table = pa.Table.from_pandas(pd.read_csv(csv_path), preserve_index=False)
+        # Unique temp file per writer so concurrent processes never share one
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(arrow_path) or ".", suffix=".arrow.tmp")
+        os.close(fd)
+        try:
+            feather.write_feather(table, tmp_path, compression="uncompressed")
+            os.replace(tmp_path, arrow_path)
+        except OSError:
+            os.remove(tmp_path)
+            # Another process published this version first (and may have it mapped)
+            if not os.path.exists(arrow_path):
+                raise
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    table = feather.read_table(arrow_path, memory_map=True)
+    _remove_old_versions(stem, arrow_path)
+    return table
+
+
+def _remove_old_versions(stem, current_path):
+    directory = os.path.dirname(stem) or "."
+    prefix = os.path.basename(stem) + "."
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.startswith(prefix) and name.endswith(".arrow") and path != current_path:
+            try:
+                os.remove(path)
+            except OSError:
+                # Still mapped somewhere (Windows); a later rebuild retries
+                pass
@@ -0,0 +1,179 @@
+import json
+
+import jsonschema
+
+
+# Symptom names are normalized and matched in Python, so one odd item
+# (different case, an unlisted symptom) does not reject the whole reply
+SYMPTOM_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "symptoms": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": ["symptoms"],
+    "additionalProperties": False
+}
+
+# Likelihood case and extra keys per condition are tolerated for the same
+# reason; format_conditions reads only the four known keys
+CONDITION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "conditions": {
+            "type": "array",
+            "minItems": 1,
+            "maxItems": 3,
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string", "minLength": 1},
+                    "likelihood": {"type": "string", "pattern": "(?i)^\\s*(high|medium|low)\\s*$"},
+                    "explanation": {"type": "string"},
+                    "next_steps": {"type": "string"}
+                },
+                "required": ["name", "likelihood", "explanation", "next_steps"]
+            }
+        }
+    },
+    "required": ["conditions"],
+    "additionalProperties": False
+}
+
+# Tight output budgets: the largest valid object fits well inside these
+SYMPTOM_MAX_TOKENS = 80
+CONDITION_MAX_TOKENS = 512
+MAX_ATTEMPTS = 2
+
+
+class StructuredOutputError(ValueError):
+    pass
+
+
+class GenerationStats:
+    __slots__ = ("attempts", "failures")
+
+    def __init__(self):
+        self.attempts = 0
+        self.failures = 0
+
+
+class JsonObjectScanner:
+    """Incrementally scan streamed text for the first complete JSON object."""
+
+    def __init__(self):
+        self.text = ""
+        self.start = -1
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, chunk):
+        """Add ``chunk``; return the complete object text once it closes, else None."""
+        offset = len(self.text)
+        self.text += chunk
+        for i in range(offset, len(self.text)):
+            char = self.text[i]
+            if self.start < 0:
+                if char == "{":
+                    self.start = i
+                    self.depth = 1
+                continue
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char == "{":
+                self.depth += 1
+            elif char == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    return self.text[self.start:i + 1]
+        return None
+
+
+def stream_json_object(chunks, prefix=""):
+    """Read ``chunks`` only until the first JSON object is complete.
+
+    ``prefix`` is the text the prompt was prefilled with. It is dropped if
+    the model repeats it at the start of its reply.
+    """
+    scanner = JsonObjectScanner()
+    try:
+        for chunk in chunks:
+            if prefix and chunk.strip():
+                if not chunk.lstrip().startswith(prefix):
+                    scanner.feed(prefix)
+                prefix = ""
+            obj_text = scanner.feed(chunk)
+            if obj_text is not None:
+                return obj_text
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+    raise StructuredOutputError(f"Incomplete JSON object in model output: {scanner.text[:200]!r}")
+
+
+def parse_json_object(text, schema):
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise StructuredOutputError(f"Invalid JSON: {e}") from e
+    try:
+        jsonschema.validate(data, schema)
+    except jsonschema.ValidationError as e:
+        raise StructuredOutputError(f"Schema violation: {e.message}") from e
+    return data
+
+
+def generate_structured(model, prompt, schema, max_new_tokens, max_attempts=MAX_ATTEMPTS, stats=None):
+    """Generate a JSON object matching ``schema``, retrying on malformed output.
+
+    The prompt is prefilled with the opening brace (a repeated brace in the
+    reply is tolerated), output is greedy and capped at ``max_new_tokens``,
+    and the stream is closed as soon as the object is complete. Raises
+    ``StructuredOutputError`` once every attempt has failed.
+    """
+    params = {"decoding_method": "greedy", "max_new_tokens": max_new_tokens}
+    attempt_prompt = prompt
+    error = None
+    for _ in range(max_attempts):
+        if stats is not None:
+            stats.attempts += 1
+        try:
+            chunks = model.generate_text_stream(prompt=attempt_prompt + "{", params=params)
+            obj_text = stream_json_object(chunks, prefix="{")
+            return parse_json_object(obj_text, schema)
+        except StructuredOutputError as e:
+            error = e
+            if stats is not None:
+                stats.failures += 1
+            attempt_prompt = (
+                f"{prompt}\nYour previous reply was rejected ({e}). "
+                "Reply with ONLY the JSON object.\n"
+            )
+    raise error
+
+
+def normalize_symptoms(names):
+    normalized = []
+    for name in names:
+        name = name.strip().lower().replace(" ", "_").replace("-", "_")
+        if name and name not in normalized:
+            normalized.append(name)
+    return normalized
+
+
+def format_conditions(conditions):
+    blocks = []
+    for i, condition in enumerate(conditions, start=1):
+        blocks.append(
+            f"**{i}. {condition['name']}** (Likelihood: {condition['likelihood'].strip().title()})\n\n"
+            f"{condition['explanation']}\n\n"
+            f"*Next steps:* {condition['next_steps']}"
+        )
+    return "\n\n".join(blocks)
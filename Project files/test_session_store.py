@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from session_store import TreatmentRecord, load_shared_table, recent, ring_buffer
+
+
+def test_ring_buffer_drops_oldest_entries():
+    buffer = ring_buffer(3)
+    for i in range(5):
+        buffer.append(i)
+    assert list(buffer) == [2, 3, 4]
+
+
+def test_recent_returns_last_entries_in_order():
+    buffer = ring_buffer(10)
+    buffer.extend(range(6))
+    assert recent(buffer, 4) == [2, 3, 4, 5]
+    assert recent(buffer, 20) == [0, 1, 2, 3, 4, 5]
+    assert recent(ring_buffer(5), 3) == []
+
+
+def test_treatment_record_round_trips_compressed_plan():
+    plan = "1. Paracetamol 500mg every 6 hours 💊\n" * 50
+    record = TreatmentRecord("Jane", 34, "Female", "Flu", "None", "None", "None", plan)
+    assert record.treatment == plan
+    assert len(record._treatment) < len(plan.encode("utf-8"))
+
+
+def test_treatment_record_has_no_instance_dict():
+    record = TreatmentRecord("Jane", 34, "Female", "Flu", "None", "None", "None", "Rest")
+    with pytest.raises(AttributeError):
+        record.extra = 1
+
+
+def test_load_shared_table_missing_csv(tmp_path):
+    assert load_shared_table(str(tmp_path / "missing.csv")) is None
+
+
+def append_row(csv_path, row):
+    with open(csv_path, "a") as f:
+        f.write(row)
+    # Force a distinct mtime even on filesystems with coarse timestamps
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_load_shared_table_rebuilds_after_append(tmp_path):
+    csv_path = tmp_path / "patients.csv"
+    csv_path.write_text("Date,Heart Rate\n2025-04-01,80\n")
+
+    table = load_shared_table(str(csv_path))
+    assert table.num_rows == 1
+
+    append_row(csv_path, "2025-04-02,90\n")
+    table = load_shared_table(str(csv_path))
+    assert table.column("Heart Rate").to_pylist() == [80, 90]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_load_shared_table_reuses_current_version(tmp_path):
+    csv_path = tmp_path / "patients.csv"
+    csv_path.write_text("Date,Heart Rate\n2025-04-01,80\n")
+
+    load_shared_table(str(csv_path))
+    arrow_files = list(tmp_path.glob("*.arrow"))
+    mtime = arrow_files[0].stat().st_mtime_ns
+    load_shared_table(str(csv_path))
+    assert list(tmp_path.glob("*.arrow")) == arrow_files
+    assert arrow_files[0].stat().st_mtime_ns == mtime
+
+
+def test_load_shared_table_never_overwrites_a_mapped_table(tmp_path):
+    csv_path = tmp_path / "patients.csv"
+    csv_path.write_text("Date,Heart Rate\n2025-04-01,80\n")
+
+    old_table = load_shared_table(str(csv_path))
+    old_file = next(tmp_path.glob("*.arrow"))
+
+    append_row(csv_path, "2025-04-02,90\n")
+    new_table = load_shared_table(str(csv_path))
+
+    # The old mapping stays readable and the new version lives in a new file
+    assert old_table.column("Heart Rate").to_pylist() == [80]
+    assert new_table.column("Heart Rate").to_pylist() == [80, 90]
+    assert len([p for p in tmp_path.glob("*.arrow") if p != old_file]) == 1
+    if os.name != "nt":
+        # Unlinking a mapped file is allowed here, so the old version is cleaned up
+        assert not old_file.exists()
@@ -0,0 +1,129 @@
+import json
+
+import pytest
+
+pytest.importorskip("jsonschema")
+
+from structured_output import (
+    CONDITION_SCHEMA, SYMPTOM_SCHEMA, GenerationStats, JsonObjectScanner, StructuredOutputError,
+    format_conditions, generate_structured, normalize_symptoms, stream_json_object
+)
+
+
+class FakeModel:
+    """Streams one scripted reply per call, recording prompts and how much was read."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.prompts = []
+        self.chunks_read = 0
+
+    def generate_text_stream(self, prompt, params=None):
+        self.prompts.append(prompt)
+        reply = self.replies.pop(0)
+        for i in range(0, len(reply), 3):
+            self.chunks_read += 1
+            yield reply[i:i + 3]
+
+
+def feed_all(chunks):
+    scanner = JsonObjectScanner()
+    for chunk in chunks:
+        result = scanner.feed(chunk)
+        if result is not None:
+            return result
+    return None
+
+
+def test_scanner_returns_first_complete_object():
+    assert feed_all(['noise {"a": {"b"', ': 1}}', ' trailing {"c": 2}']) == '{"a": {"b": 1}}'
+
+
+def test_scanner_ignores_braces_inside_strings():
+    assert feed_all(['{"text": "} not the end {"}', " more"]) == '{"text": "} not the end {"}'
+
+
+def test_scanner_handles_escaped_quotes_and_backslashes():
+    text = r'{"text": "say \"}\" and \\", "n": 1}'
+    assert feed_all([text[:12], text[12:20], text[20:]]) == text
+
+
+def test_scanner_incomplete_object():
+    assert feed_all(['{"symptoms": ["fever"']) is None
+
+
+@pytest.mark.parametrize("reply", [
+    '"symptoms": ["fever"]}',
+    '{"symptoms": ["fever"]}',
+    '  {"symptoms": ["fever"]}',
+    '\n{"symptoms": ["fever"]}',
+])
+def test_generate_structured_accepts_prefilled_and_repeated_brace(reply):
+    model = FakeModel([reply])
+    assert generate_structured(model, "prompt", SYMPTOM_SCHEMA, 80) == {"symptoms": ["fever"]}
+    assert model.prompts == ["prompt{"]
+
+
+def test_stream_stops_reading_once_object_is_complete():
+    model = FakeModel(['"symptoms": []}' + " chatter" * 50])
+    generate_structured(model, "prompt", SYMPTOM_SCHEMA, 80)
+    assert model.chunks_read == 5
+
+
+def test_stream_json_object_reports_incomplete_output():
+    with pytest.raises(StructuredOutputError, match="Incomplete"):
+        stream_json_object(iter(['"symptoms": ["fev']), prefix="{")
+
+
+def test_retry_recovers_from_invalid_first_reply():
+    model = FakeModel(["'symptoms': ['fever']}", '"symptoms": ["cough"]}'])
+    stats = GenerationStats()
+    assert generate_structured(model, "prompt", SYMPTOM_SCHEMA, 80, stats=stats) == {"symptoms": ["cough"]}
+    assert (stats.attempts, stats.failures) == (2, 1)
+    assert "rejected" in model.prompts[1]
+
+
+def test_retry_gives_up_after_max_attempts():
+    model = FakeModel(['"conditions": []}', '"conditions": [{"name": "Flu"}]}', "unused"])
+    stats = GenerationStats()
+    with pytest.raises(StructuredOutputError, match="Schema violation"):
+        generate_structured(model, "prompt", CONDITION_SCHEMA, 512, max_attempts=2, stats=stats)
+    assert (stats.attempts, stats.failures) == (2, 2)
+    assert model.replies == ["unused"]
+
+
+def test_symptom_schema_accepts_unknown_and_differently_cased_names():
+    model = FakeModel(['"symptoms": ["Fever", "runny nose", "fever"]}'])
+    response = generate_structured(model, "prompt", SYMPTOM_SCHEMA, 80)
+    assert normalize_symptoms(response["symptoms"]) == ["fever", "runny_nose"]
+
+
+def test_condition_schema_accepts_lowercase_likelihood_and_extra_keys():
+    reply = json.dumps({"conditions": [
+        {"name": "Flu", "likelihood": "high", "explanation": "Fever.", "next_steps": "Rest.", "icd10": "J11"},
+        {"name": "Cold", "likelihood": " LOW ", "explanation": "Cough.", "next_steps": "Fluids."},
+    ]})
+    model = FakeModel([reply, "unused"])
+    stats = GenerationStats()
+    response = generate_structured(model, "prompt", CONDITION_SCHEMA, 512, stats=stats)
+    assert (stats.attempts, stats.failures) == (1, 0)
+    text = format_conditions(response["conditions"])
+    assert "**1. Flu** (Likelihood: High)" in text
+    assert "**2. Cold** (Likelihood: Low)" in text
+    assert "J11" not in text
+
+
+def test_condition_schema_rejects_unknown_likelihood():
+    reply = '"conditions": [{"name": "Flu", "likelihood": "Very high", "explanation": "", "next_steps": ""}]}'
+    model = FakeModel([reply, reply])
+    with pytest.raises(StructuredOutputError, match="Schema violation"):
+        generate_structured(model, "prompt", CONDITION_SCHEMA, 512)
+
+
+def test_format_conditions_numbers_each_condition():
+    text = format_conditions([
+        {"name": "Flu", "likelihood": "High", "explanation": "Fever.", "next_steps": "Rest."},
+        {"name": "Cold", "likelihood": "Low", "explanation": "Cough.", "next_steps": "Fluids."},
+    ])
+    assert text.startswith("**1. Flu** (Likelihood: High)")
+    assert "**2. Cold** (Likelihood: Low)" in text